@@ -1,35 +1,84 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import functools
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import json
+import logging
+import operator
 import os
 import re
 import sys
-from collections.abc import Iterable
-from dataclasses import dataclass
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pdfplumber.page import Page
+
+
+# pdfminer emits very chatty DEBUG/INFO records; even filtered ones cost a level check each
+PDF_LOGGERS = ("pdfminer", "pdfplumber")
+
+
+def _quiet_pdf_loggers(quiet: bool = True) -> None:
+    """Pin pdfminer/pdfplumber loggers to ERROR (or restore inheritance when quiet=False)."""
+    level = logging.ERROR if quiet else logging.NOTSET
+    for name in PDF_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+
+_quiet_pdf_loggers()
+
 
 # -------- Primary extractor (pdfplumber) --------
-try:
-    import pdfplumber  # type: ignore
-except Exception:
-    pdfplumber = None  # type: ignore
+@functools.lru_cache(maxsize=1)
+def _get_pdfplumber():
+    """Import pdfplumber on first use so `--help` and tests don't pay for pdfminer at import."""
+    try:
+        import pdfplumber  # type: ignore
+    except Exception:
+        return None
+    return pdfplumber
 
 
 # -------- Optional OCR stack (PaddleOCR) --------
+@functools.lru_cache(maxsize=1)
 def _lazy_import_paddle():
+    """Import PaddleOCR once (a multi-second import); None when unavailable."""
     try:
         from paddleocr import PaddleOCR  # type: ignore
     except Exception:
-        PaddleOCR = None  # type: ignore
+        return None
+    return PaddleOCR
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_import_pdf2image():
+    """Import pdf2image's convert_from_path once; None when unavailable."""
     try:
         from pdf2image import convert_from_path  # type: ignore
     except Exception:
-        convert_from_path = None  # type: ignore
+        return None
+    return convert_from_path
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_import_pymupdf():
+    """Import PyMuPDF once for in-process rasterization; None when not installed."""
     try:
-        import numpy as np  # type: ignore
+        import pymupdf  # type: ignore
     except Exception:
-        np = None  # type: ignore
-    return PaddleOCR, convert_from_path, np
+        return None
+    return pymupdf
 
 
 # ---------- Subject aliases ----------
@@ -43,25 +92,33 @@ SUBJECT_ALIASES = {
     "econ": ["ECON", "ECN"],
     "engr": ["ENGR", "EGR"],
 }
+# Frozen alias -> prefixes table so expansion is a flat lookup per label
+_SUBJECT_EXPAND: dict[str, tuple[str, ...]] = {k: tuple(v) for k, v in SUBJECT_ALIASES.items()}
 
 # ---------- Regexes ----------
 NUM_TOKEN_PAT = re.compile(r"(?i)^\d{3,4}[A-Z]?$")
+# Letter grade inside joined text, tolerating a split sign ('B +')
+SPACED_GRADE_PAT = re.compile(r"(?<!\w)(A|B|C|D|F)\s*([+\-])?(?!\w)")
+# Trailing course number (+ optional suffix letter) of a code, used to sort output
+CODE_NUMBER_PAT = re.compile(r"(\d{3,4})([A-Z]?)$")
 
 # Strict letter grades A-F with optional +/-
-GRADE_TOKEN_STRICT = re.compile(r"(?i)^(A|B|C|D|F)([+\-\u2212])?$")
+STRICT_GRADES = frozenset(g + sign for g in "ABCDF" for sign in ("", "+", "-", "\u2212"))
 # Status/loose grades (avoid unless no strict grade found)
-GRADE_TOKEN_LOOSE = re.compile(r"(?i)^(P|S|U|I|T)$")
-INPROG_PAT = re.compile(r"(?i)\bIN\s+PROGRESS\b")
+LOOSE_GRADES = frozenset({"P", "S", "U", "I", "T"})
+# Matched against uppercased text only, so no (?i) case folding in the engine
+INPROG_PAT = re.compile(r"\bIN\s+PROGRESS\b")
 
 # Row-level admin/heading detectors
 ADMIN_ROW = re.compile(
     r"(?i)^(Ehrs|GPA|TOTAL|Dean's List|Good Standing|Earned Hrs|TRANSCRIPT TOTALS|Totals?)\b"
 )
-SEMESTER_HEADING = re.compile(
-    r"(?i)^(FALL|SPRING|SUMMER|WINTER|AUTUMN|JAN|MAY|AUGUST)\s+(SEMESTER|TERM|SESSION|QUARTER)\b"
+# Semester and cumulative/summary headings in one alternation, so a row is scanned once.
+# Matched against uppercased row text only (see _is_admin_row).
+HEADING_ROW = re.compile(
+    r"^(?:(?:FALL|SPRING|SUMMER|WINTER|AUTUMN|JAN|MAY|AUGUST)\s+"
+    r"(?:SEMESTER|TERM|SESSION|QUARTER)|CUMULATIVE|SUMMARY)\b"
 )
-CUMULATIVE_HEADING = re.compile(r"(?i)^(CUMULATIVE|SUMMARY)\b")
-END_OF_TRANSCRIPT = re.compile(r"(?i)END OF TRANSCRIPT")
 URL_PAT = re.compile(r"https?://")
 
 # Token-level "stop" markers that should not appear inside titles
@@ -99,27 +156,70 @@ STOP_TOKENS = {
 
 # Additional "pre-title" tokens often appearing between code and title
 # (campus, delivery mode, or institution codes). We skip these until actual title begins.
-PRETITLE_TOKENS = {
-    "MAIN",
-    "CAMPUS",
-    "CAMPUS-",
-    "ONLINE",
-    "REMOTE",
-    "DISTANCE",
-    "LEARNING",
-    "DL",
-    "HYBRID",
-    "UNF",
-    "UTK",
-    "UNIV",
-    "COL",
-}
+PRETITLE_TOKENS = frozenset(
+    {
+        "MAIN",
+        "CAMPUS",
+        "CAMPUS-",
+        "ONLINE",
+        "REMOTE",
+        "DISTANCE",
+        "LEARNING",
+        "DL",
+        "HYBRID",
+        "UNF",
+        "UTK",
+        "UNIV",
+        "COL",
+    }
+)
 
-LEVEL_TOKEN = re.compile(r"(?i)^(UG|GR|G|U)$")  # program level markers, not grades
-FLAG_SINGLE_LETTERS = {"C", "R", "H"}  # tiny flags columns
+CODE_SEPARATORS = frozenset({":", "-", "\u2013", "\u2014"})  # standalone, as in 'MATH - 241'
+LEVEL_TOKENS = frozenset({"UG", "GR", "G", "U"})  # program level markers, not grades
+FLAG_SINGLE_LETTERS = frozenset({"C", "R", "H"})  # tiny flags columns
+# Column labels printed left of a course code; never read as a grade there
+GRADE_LABEL_TOKENS = frozenset(
+    {"GRD", "GR", "CR", "CRED", "CREDIT", "CREDITS", "PTS", "R", "HRS", "HOURS"}
+)
+
+# Student name header patterns, tried in order against the joined page 1-4 text.
+# Captures run greedily to end of line; for Record-of, a trailing "Page: n" (any case) is
+# cut off afterwards with RECORD_OF_PAGE_PAT instead of a lazy (.+?) that retries at every
+# character.
+# Each pattern is paired with a literal its match must contain (in the uppercased text),
+# so a plain substring test skips the regex on transcripts without that label.
+NAME_PATS: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("RECORD OF:", re.compile(r"(?im)^\s*Record of:\s*(.+)$")),
+    ("ISSUED TO:", re.compile(r"(?im)^\s*Issued To:\s*([A-Z][A-Z\s.\-']+)\b.*$")),
+    ("STUDENT NAME", re.compile(r"(?im)^\s*Student Name\s*:\s*(.+)$")),
+    ("NAME", re.compile(r"(?im)^\s*Name\s*:\s*(.+)$")),
+    (
+        ",",
+        re.compile(
+            r"(?im)^\s*([A-Z][A-Za-z'.\-]+,\s+[A-Z][A-Za-z'.\-]+)\s+\d{2,3}[- ]?\d{2}[- ]?\d{4}\b"
+        ),
+    ),
+)
+RECORD_OF_LITERAL = NAME_PATS[0][0]
+# Searched from index 1: the old lazy capture always kept at least one character
+RECORD_OF_PAGE_PAT = re.compile(r"(?i)\s*Page:")
+LABEL_VALUE_PAT = re.compile(r"^[A-Z][A-Za-z &/]+\s:\s")
+UNIVERSITY_PAT = re.compile(r"(?i)\b(UNIVERSITY|COLLEGE|INSTITUTE|POLYTECHNIC|COMMUNITY COLLEGE)\b")
+PHONE_PAT = re.compile(r"\(?\d{3}\)?[\s\-]\d{3}[\s\-]\d{4}")
+TRAILING_ID_PAREN_PAT = re.compile(r"\s*\((?=[^)]*[0-9])[^)]*\)\s*$")
+# Substring weights used to rank university-name candidates (see _university_score)
+UNIVERSITY_SCORE_TERMS = (
+    ("STATE UNIVERSITY OF NEW YORK", 4),
+    ("COLLEGE AT", 3),
+    ("CORTLAND", 2),
+    ("UNIVERSITY", 2),
+    ("COLLEGE", 1),
+)
+# Catalog prefixes like 'ST:' / 'Special Topics -' stripped from the front of course titles
+TITLE_PREFIX_PAT = re.compile(r"(?i)^(ST|SPECIAL\s+TOPICS|SELECTED\s+TOPICS|TOPICS)\s*[:\-]\s*")
 
 
-@dataclass
+@dataclass(slots=True)
 class Tok:
     text: str
     x0: float
@@ -127,182 +227,539 @@ class Tok:
     y0: float
     y1: float
     page: int
+    # Uppercased text, computed once: the scanner compares it against every token set
+    up: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.up = self.text.upper()
 
 
-@dataclass
+# Sort/bisect key: every Row keeps its toks ordered by x0
+_tok_x0 = operator.attrgetter("x0")
+
+
+@dataclass(slots=True)
 class Row:
     page: int
     y: float
     toks: list[Tok]
+    # Joined token text, filled in by _row_text once the row is complete
+    text: str | None = field(default=None, repr=False, compare=False)
+
+
+# NBSP -> space; en dash, em dash and minus sign -> ASCII hyphen
+_NORMALIZE_TABLE = str.maketrans({"\xa0": " ", "\u2013": "-", "\u2014": "-", "\u2212": "-"})
 
 
 def _normalize_text(s: str) -> str:
-    s = s.replace("\xa0", " ").replace("\u00a0", " ")
-    s = s.replace("\u2013", "-").replace("\u2014", "-").replace("\u2212", "-")
-    return s
+    # Nearly every token is plain ASCII (an O(1) check), which has nothing to translate
+    if s.isascii():
+        return s
+    return s.translate(_NORMALIZE_TABLE)
 
 
 def _expand_subjects(subjects: Iterable[str]) -> list[str]:
-    expanded = set()
-    for s in subjects:
-        key = s.lower()
-        if key in SUBJECT_ALIASES:
-            expanded.update(SUBJECT_ALIASES[key])
-        else:
-            expanded.add(s.upper())
+    expanded = set(
+        itertools.chain.from_iterable(
+            _SUBJECT_EXPAND.get(s.lower(), (s.upper(),)) for s in subjects
+        )
+    )
     return sorted(expanded)
 
 
-def _allowed_set(subjects: Iterable[str]) -> set[str]:
-    return {p.upper() for p in _expand_subjects(subjects)}
+@functools.lru_cache(maxsize=64)
+def _allowed_set(subjects: tuple[str, ...]) -> frozenset[str]:
+    """Expand subject labels into the set of allowed course prefixes (memoized per label set)."""
+    return frozenset(p.upper() for p in _expand_subjects(subjects))
+
 
+# Reading order for pdfplumber words, which always carry "top" and "x0"
+_WORD_ORDER = operator.itemgetter("top", "x0")
 
-def _extract_rows_pdfplumber(path: Path, y_tol: float = 3.2) -> list[Row]:
+
+def _page_rows(page: Page, pidx: int, y_tol: float) -> list[Row]:
+    """Group one pdfplumber page's words into x-sorted rows."""
     rows: list[Row] = []
+    words = page.extract_words() or []
+    # The words are all we need; drop pdfminer's cached chars/objects/layout for this page now
+    # instead of holding every page's caches until the document closes.
+    page.flush_cache()
+    words.sort(key=_WORD_ORDER)
+    cur: Row | None = None
+    for w in words:
+        t = _normalize_text(w.get("text", "") or "")
+        if not t:
+            continue
+        top = float(w.get("top", 0.0))
+        x0 = float(w.get("x0", 0.0))
+        x1 = float(w.get("x1", x0))
+        bottom = float(w.get("bottom", top + 8))
+        tok = Tok(t, x0, x1, top, bottom, pidx)
+        if cur is None or abs(top - cur.y) > y_tol or (tok.page != cur.page):
+            if cur is not None:
+                cur.toks.sort(key=_tok_x0)
+                rows.append(cur)
+            cur = Row(pidx, top, [tok])
+        else:
+            cur.toks.append(tok)
+    if cur is not None:
+        cur.toks.sort(key=_tok_x0)
+        rows.append(cur)
+    return rows
+
+
+def _page_range_rows(path: str, pages: range, y_tol: float) -> list[Row]:
+    """Process-pool worker: open `path` once and group the words of each page in `pages`."""
+    rows: list[Row] = []
+    pdfplumber = _get_pdfplumber()
     if pdfplumber is None:
         return rows
     with pdfplumber.open(path) as pdf:
-        for pidx, page in enumerate(pdf.pages, start=1):
-            words = page.extract_words() or []
-            words.sort(key=lambda w: (w.get("top", 0.0), w.get("x0", 0.0)))
-            cur: Row | None = None
-            for w in words:
-                t = _normalize_text(w.get("text", "") or "")
-                if not t:
-                    continue
-                top = float(w.get("top", 0.0))
-                x0 = float(w.get("x0", 0.0))
-                x1 = float(w.get("x1", x0))
-                bottom = float(w.get("bottom", top + 8))
-                tok = Tok(t, x0, x1, top, bottom, pidx)
-                if cur is None or abs(top - cur.y) > y_tol or (tok.page != cur.page):
-                    if cur is not None:
-                        cur.toks.sort(key=lambda t: t.x0)
-                        rows.append(cur)
-                    cur = Row(pidx, top, [tok])
-                else:
-                    cur.toks.append(tok)
-            if cur is not None:
-                cur.toks.sort(key=lambda t: t.x0)
-                rows.append(cur)
-    rows.sort(key=lambda r: (r.page, r.y))
+        for pidx in pages:
+            rows.extend(_page_rows(pdf.pages[pidx - 1], pidx, y_tol))
     return rows
 
 
-def _extract_rows_ocr(path: Path, dpi: int = 300, y_tol: float = 6.0) -> list[Row]:
+def _extract_rows_pdfplumber(
+    path: Path, y_tol: float = 3.2, workers: int = 0, quiet_pdf_logs: bool = True
+) -> list[Row]:
+    """
+    Extract token rows from every page with pdfplumber.
+    With workers > 1, pages are parsed in that many processes (capped at this process's CPU
+    share inside a --jobs worker) and reassembled in page order; quiet_pdf_logs is the
+    pdfminer/pdfplumber log setting those processes start with.
+    """
     rows: list[Row] = []
-    PaddleOCR, convert_from_path, np = _lazy_import_paddle()
-    if PaddleOCR is None or convert_from_path is None:
+    workers = _page_worker_count(workers)
+    pdfplumber = _get_pdfplumber()
+    if pdfplumber is None:
         return rows
+    with pdfplumber.open(path) as pdf:
+        pages = pdf.pages
+        if workers > 1 and len(pages) > 1:
+            # One contiguous page range per worker, so each process opens the PDF only once
+            n_workers = min(workers, len(pages))
+            step = -(-len(pages) // n_workers)
+            ranges = [
+                range(p, min(p + step, len(pages) + 1)) for p in range(1, len(pages) + 1, step)
+            ]
+            parse_range = functools.partial(_page_range_rows, str(path), y_tol=y_tol)
+            with ProcessPoolExecutor(
+                max_workers=len(ranges),
+                initializer=_quiet_pdf_loggers,
+                initargs=(quiet_pdf_logs,),
+            ) as pex:
+                for range_rows in pex.map(parse_range, ranges):
+                    rows.extend(range_rows)
+        else:
+            for pidx, page in enumerate(pages, start=1):
+                rows.extend(_page_rows(page, pidx, y_tol))
+    rows.sort(key=lambda r: (r.page, r.y))
+    return rows
+
+
+# (page, text, x0, y0, x1, y1) for one recognized OCR line
+OcrToken = tuple[int, str, float, float, float, float]
+
+
+# --jobs worker processes sharing this machine's cores (set in each worker; 1 outside a pool)
+_file_pool_size = 1
+
+
+def _init_file_worker(quiet_pdf_logs: bool, pool_size: int) -> None:
+    """--jobs pool initializer: PDF log level, plus the pool size CPU shares are split by."""
+    global _file_pool_size
+    _quiet_pdf_loggers(quiet_pdf_logs)
+    _file_pool_size = max(1, pool_size)
+
+
+def _cpu_share() -> int:
+    """CPUs this process may use: every core when alone, an even share inside a --jobs pool."""
+    return max(1, (os.cpu_count() or 1) // _file_pool_size)
+
+
+def _ocr_cpu_threads() -> int:
+    """CPU threads per OCR engine."""
+    return _cpu_share()
+
+
+def _page_worker_count(requested: int) -> int:
+    """
+    Page processes to start for one file. Inside a --jobs worker the request is capped at that
+    worker's CPU share, so --jobs N --page-workers M never runs N x M processes on fewer cores.
+    """
+    if _file_pool_size > 1:
+        return min(requested, _cpu_share())
+    return requested
+
+
+@functools.lru_cache(maxsize=4)
+def _get_paddle_ocr(lang: str = "en"):
+    """Build (once per language) the PaddleOCR engine; model loading dominates OCR start-up."""
+    PaddleOCR = _lazy_import_paddle()
+    if PaddleOCR is None:
+        return None
+    # Transcript pages carry dozens of text lines; recognise their crops 16 at a time
+    # (PaddleOCR's default is 6) so each page needs fewer recognizer passes. On CPU, use
+    # the MKL-DNN kernels on this process's share of the cores (all of them outside a --jobs
+    # pool, so N workers don't run N x cpu_count threads). Releases that reject these
+    # options get defaults.
+    try:
+        return PaddleOCR(  # type: ignore
+            lang=lang,
+            rec_batch_num=16,
+            enable_mkldnn=True,
+            cpu_threads=_ocr_cpu_threads(),
+        )
+    except (TypeError, ValueError):
+        return PaddleOCR(lang=lang)  # type: ignore
+
+
+def _ocr_cache_path(path: Path, engine: str, lang: str, dpi: int) -> Path | None:
+    """
+    Location of the cached OCR result for this PDF's bytes, OCR engine, language and DPI.
+    Returns None when caching is disabled (TRANSCRIPT_OCR_CACHE=0) or the file is unreadable.
+    """
+    if os.environ.get("TRANSCRIPT_OCR_CACHE", "").strip() == "0":
+        return None
+    try:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "transcript_parser" / "ocr" / f"{digest}-{engine}-{lang}-{dpi}.json"
+
+
+def _load_ocr_cache(cache_file: Path | None) -> list[OcrToken] | None:
+    """Read cached OCR tokens, or None on a miss or unreadable entry."""
+    if cache_file is None or not cache_file.is_file():
+        return None
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        return [
+            (int(p), str(t), float(x0), float(y0), float(x1), float(y1))
+            for p, t, x0, y0, x1, y1 in data
+        ]
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _save_ocr_cache(cache_file: Path | None, tokens: list[OcrToken]) -> None:
+    """Best-effort write of OCR tokens; cache failures never break parsing."""
+    if cache_file is None:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(tokens), encoding="utf-8")
+    except OSError:
+        pass
+
 
+def _render_pages_pymupdf(
+    pymupdf: ModuleType, path: Path, dpi: int
+) -> Iterator[tuple[int, object]]:
+    """
+    Yield (page, 2-D grayscale uint8 array) rendered in-process by PyMuPDF: no pdftoppm
+    process per page and no PNG encode/decode round trip. Both OCR engines accept arrays.
+    """
+    import numpy as np
+
+    # Like the pdftoppm path: an unreadable document yields nothing, a bad page is skipped
     try:
-        ocr = PaddleOCR(lang="en")  # type: ignore
+        doc = pymupdf.open(str(path))
     except Exception:
-        return rows
+        return
+    with doc:
+        for pidx in range(1, doc.page_count + 1):
+            try:
+                pix = doc[pidx - 1].get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY)
+            except Exception:
+                continue
+            yield pidx, np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
 
+
+def _render_pages_ahead(
+    convert_from_path: Callable[..., list[str]], path: Path, dpi: int, out_dir: str
+) -> Iterator[tuple[int, str]]:
+    """
+    Yield (page, PNG path) one page at a time, rasterizing the next page on a helper
+    thread while the caller OCRs the current one. Falls back to rendering every page
+    up front when the page count is unknown.
+    """
     try:
-        images = convert_from_path(str(path), dpi=dpi)
+        from pdf2image import pdfinfo_from_path  # type: ignore
+
+        n_pages = int(pdfinfo_from_path(str(path))["Pages"])
     except Exception:
-        return rows
+        n_pages = 0
 
-    rows_by_page: dict[int, list[Row]] = {}
+    if n_pages < 2:
+        try:
+            image_paths = convert_from_path(
+                str(path),
+                dpi=dpi,
+                output_folder=out_dir,
+                paths_only=True,
+                fmt="png",
+                thread_count=os.cpu_count() or 1,
+            )
+        except Exception:
+            return
+        yield from enumerate(image_paths, start=1)
+        return
+
+    def render(pidx: int) -> list[str]:
+        return convert_from_path(
+            str(path),
+            dpi=dpi,
+            first_page=pidx,
+            last_page=pidx,
+            output_folder=out_dir,
+            paths_only=True,
+            fmt="png",
+        )
+
+    # pdftoppm and PaddleOCR both run outside the GIL, so one page of read-ahead overlaps them
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        pending = ex.submit(render, 1)
+        for pidx in range(1, n_pages + 1):
+            try:
+                page_paths = pending.result()
+            except Exception:
+                page_paths = []
+            if pidx < n_pages:
+                pending = ex.submit(render, pidx + 1)
+            for img_path in page_paths:
+                yield pidx, img_path
+
+
+RAPID_OCR_MODULES = ("rapidocr_openvino", "rapidocr_onnxruntime")
 
-    def push_token(page_idx: int, text: str, x0: float, y0: float, x1: float, y1: float):
-        for r in rows_by_page.setdefault(page_idx, []):
-            if abs(r.y - y0) <= y_tol:
-                r.toks.append(Tok(text, x0, x1, y0, y1, page_idx))
-                return
-        rows_by_page[page_idx].append(Row(page_idx, y0, [Tok(text, x0, x1, y0, y1, page_idx)]))
 
-    for pidx, pil_im in enumerate(images, start=1):
+def _ocr_engine_name() -> str:
+    """'rapid' when a RapidOCR package is installed and not opted out, else 'paddle'."""
+    if os.environ.get("TRANSCRIPT_OCR_ENGINE", "").strip().lower() == "paddle":
+        return "paddle"
+    # find_spec locates the package without importing it (a cache hit needs no engine)
+    if any(importlib.util.find_spec(m) is not None for m in RAPID_OCR_MODULES):
+        return "rapid"
+    return "paddle"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_rapid_ocr():
+    """
+    Build the RapidOCR engine (PP-OCR weights on OpenVINO / ONNX Runtime) when one of its
+    packages is installed; on CPU it is markedly faster than Paddle Inference. None otherwise.
+    """
+    for module in RAPID_OCR_MODULES:
         try:
-            im = pil_im.convert("RGB")
-            arr = None
-            if np is not None:
-                try:
-                    arr = np.array(im)  # type: ignore
-                except Exception:
-                    arr = None
-            res = ocr.ocr(arr if arr is not None else im)  # type: ignore
+            return importlib.import_module(module).RapidOCR()
         except Exception:
             continue
+    return None
 
-        if not res:
-            continue
-        rows_by_page.setdefault(pidx, [])
-        for line in res[0]:
+
+def _run_ocr(path: Path, dpi: int, lang: str, engine: str) -> tuple[list[OcrToken], str]:
+    """
+    Rasterize the PDF and OCR every page, returning line tokens and the engine that read
+    them: RapidOCR for engine 'rapid' (PaddleOCR if it cannot be built), else PaddleOCR.
+    """
+    tokens: list[OcrToken] = []
+    # pdf2image (and its pdftoppm dependency) is only needed without PyMuPDF
+    pymupdf = _lazy_import_pymupdf()
+    convert_from_path = _lazy_import_pdf2image() if pymupdf is None else None
+    if pymupdf is None and convert_from_path is None:
+        return tokens, engine
+
+    # PaddleOCR is only imported when RapidOCR is not doing the work
+    rapid = _get_rapid_ocr() if engine == "rapid" else None
+    if rapid is None:
+        engine = "paddle"
+    try:
+        ocr = rapid or _get_paddle_ocr(lang)
+    except Exception:
+        return tokens, engine
+    if ocr is None:
+        return tokens, engine
+
+    # Pages come one at a time, either as in-memory arrays from PyMuPDF or as PNG paths
+    # from pdftoppm; no PIL page list is held in memory. pdf2image was only loaded (and is
+    # only set) when PyMuPDF is missing.
+    with tempfile.TemporaryDirectory(prefix="transcript_ocr_") as tmpdir:
+        pages: Iterator[tuple[int, object]] = (
+            _render_pages_pymupdf(pymupdf, path, dpi)
+            if convert_from_path is None
+            else _render_pages_ahead(convert_from_path, path, dpi, tmpdir)
+        )
+        for pidx, img in pages:
             try:
-                box, (txt, _conf) = line
+                if rapid is not None:
+                    # RapidOCR: (lines | None, elapsed), each line [box, text, score]
+                    lines = rapid(img)[0]
+                else:
+                    # PaddleOCR: one entry per image, each line [box, (text, conf)]
+                    res = ocr.ocr(img)  # type: ignore
+                    lines = res[0] if res else None
             except Exception:
                 continue
-            if not txt:
-                continue
-            xs = [pt[0] for pt in box]
-            ys = [pt[1] for pt in box]
-            x0, x1 = float(min(xs)), float(max(xs))
-            y0, y1 = float(min(ys)), float(max(ys))
-            push_token(pidx, _normalize_text(txt), x0, y0, x1, y1)
+
+            for line in lines or []:
+                try:
+                    if rapid is not None:
+                        box, txt, _conf = line
+                    else:
+                        box, (txt, _conf) = line
+                except Exception:
+                    continue
+                if not txt:
+                    continue
+                xs = [pt[0] for pt in box]
+                ys = [pt[1] for pt in box]
+                x0, x1 = float(min(xs)), float(max(xs))
+                y0, y1 = float(min(ys)), float(max(ys))
+                tokens.append((pidx, _normalize_text(txt), x0, y0, x1, y1))
+    return tokens, engine
+
+
+# Scanned transcripts are large fixed-pitch print: OCR first at 200 dpi (2.25x fewer pixels to
+# rasterize and detect than 300) and only re-run at 300 dpi when that finds no course codes.
+OCR_DPI = 200
+OCR_RETRY_DPI = 300
+
+
+def _extract_rows_ocr(
+    path: Path, dpi: int = 300, y_tol: float | None = None, lang: str = "en"
+) -> list[Row]:
+    rows: list[Row] = []
+    if y_tol is None:
+        # OCR boxes are in pixels: 6 px at 300 dpi, scaled to the render resolution
+        y_tol = 6.0 * dpi / 300
+    engine = _ocr_engine_name()
+    cache_file = _ocr_cache_path(path, engine, lang, dpi)
+    tokens = _load_ocr_cache(cache_file)
+    if tokens is None:
+        tokens, used = _run_ocr(path, dpi, lang, engine)
+        if used != engine:
+            # RapidOCR failed to load and PaddleOCR ran: cache under the engine that read it
+            cache_file = _ocr_cache_path(path, used, lang, dpi)
+        if tokens:
+            _save_ocr_cache(cache_file, tokens)
+
+    # Rows per page, keyed by y bucket (width y_tol). A row is only created when no other row
+    # lies within y_tol of it, so each bucket holds at most one row and a token's candidate
+    # rows are in its own bucket or the two adjacent ones.
+    rows_by_page: dict[int, dict[int, Row]] = {}
+
+    def push_token(page_idx: int, text: str, x0: float, y0: float, x1: float, y1: float):
+        tok = Tok(text, x0, x1, y0, y1, page_idx)
+        buckets = rows_by_page.setdefault(page_idx, {})
+        b = int(y0 // y_tol)
+        best: Row | None = None
+        for r in (buckets.get(b - 1), buckets.get(b), buckets.get(b + 1)):
+            if r is not None and abs(r.y - y0) <= y_tol:
+                if best is None or abs(r.y - y0) < abs(best.y - y0):
+                    best = r
+        if best is not None:
+            best.toks.append(tok)
+        else:
+            buckets[b] = Row(page_idx, y0, [tok])
+
+    for pidx, txt, x0, y0, x1, y1 in tokens:
+        push_token(pidx, txt, x0, y0, x1, y1)
 
     for pidx in sorted(rows_by_page):
-        page_rows = rows_by_page[pidx]
+        page_rows = sorted(rows_by_page[pidx].values(), key=lambda r: r.y)
         for r in page_rows:
-            r.toks.sort(key=lambda t: t.x0)
-        page_rows.sort(key=lambda r: r.y)
+            r.toks.sort(key=_tok_x0)
         rows.extend(page_rows)
 
     rows.sort(key=lambda r: (r.page, r.y))
     return rows
 
 
-def _extract_rows(path: Path, prefer_ocr: bool = False) -> tuple[list[Row], bool]:
+def _extract_rows(
+    path: Path,
+    prefer_ocr: bool = False,
+    skip_ocr: bool = False,
+    ocr_dpi: int = OCR_DPI,
+    page_workers: int = 0,
+    quiet_pdf_logs: bool = True,
+) -> tuple[list[Row], bool]:
     force_ocr = prefer_ocr or os.environ.get("TRANSCRIPT_FORCE_OCR", "").strip() == "1"
-    rows_pdf: list[Row] = [] if force_ocr else _extract_rows_pdfplumber(path)
+    rows_pdf: list[Row] = (
+        []
+        if force_ocr
+        else _extract_rows_pdfplumber(path, workers=page_workers, quiet_pdf_logs=quiet_pdf_logs)
+    )
     if rows_pdf:
         return rows_pdf, False
-    rows_ocr = _extract_rows_ocr(path)
+    # OCR is the slowest stage by far (model load + rasterization); allow hard-disabling it
+    if skip_ocr and not force_ocr:
+        return [], False
+    rows_ocr = _extract_rows_ocr(path, dpi=ocr_dpi)
     if rows_ocr:
         return rows_ocr, True
     return [], False
 
 
 def _row_text(row: Row) -> str:
-    return " ".join(t.text for t in row.toks)
+    """Space-joined token text, built on first use and kept on the row."""
+    if row.text is None:
+        row.text = " ".join(t.text for t in row.toks)
+    return row.text
 
 
-def _is_admin_row(txt: str) -> bool:
-    up = txt.strip().upper()
+def _is_admin_row(txt: str, up: str | None = None) -> bool:
+    """True for GPA/summary/heading/URL rows. Pass `up` when the uppercased text is already known."""
+    if up is None:
+        up = txt.strip().upper()
     if ADMIN_ROW.match(txt) or URL_PAT.search(txt):
         return True
-    if SEMESTER_HEADING.match(up) or CUMULATIVE_HEADING.match(up):
+    if HEADING_ROW.match(up):
         return True
-    if END_OF_TRANSCRIPT.search(up):
+    if "END OF TRANSCRIPT" in up:
         return True
-    if up.startswith("FROM:") or up.startswith("TO:"):
-        return True
-    return False
+    return up.startswith(("FROM:", "TO:"))
+
+
+def _is_alpha_prefix(s: str) -> bool:
+    """Subject prefix token shape, e.g. 'MATH': two or more ASCII letters."""
+    return len(s) >= 2 and s.isascii() and s.isalpha()
 
 
+def _is_credits(s: str) -> bool:
+    """Credits column value, e.g. '3.00' / '4.000': digits, a dot, then 2-3 digits."""
+    head, dot, tail = s.partition(".")
+    return bool(dot) and head.isdecimal() and 2 <= len(tail) <= 3 and tail.isdecimal()
+
+
+# Token predicates below are pure str -> bool and see the same few hundred words (titles,
+# column headers) on every page, so they are memoized per distinct token text.
+@functools.lru_cache(maxsize=4096)
 def _is_stop_token(t: str) -> bool:
-    return (
-        t.strip().upper().rstrip(":") in STOP_TOKENS or INPROG_PAT.fullmatch(t.strip()) is not None
-    )
+    s = t.strip()
+    up = s.upper()
+    return up.rstrip(":") in STOP_TOKENS or INPROG_PAT.fullmatch(up) is not None
 
 
 def _iter_code_pairs(toks: list[Tok]) -> list[tuple[int, int]]:
+    """(prefix index, number index) of each 'MATH 241' / 'MATH - 241' code in a row."""
     pairs: list[tuple[int, int]] = []
     n = len(toks)
     k = 0
     while k < n - 1:
-        if re.fullmatch(r"[A-Za-z]{2,}", toks[k].text) and NUM_TOKEN_PAT.fullmatch(
-            toks[k + 1].text
-        ):
+        # Most tokens are not a subject prefix; test that once before either code shape
+        if not _is_alpha_prefix(toks[k].text):
+            k += 1
+            continue
+        if NUM_TOKEN_PAT.fullmatch(toks[k + 1].text):
             pairs.append((k, k + 1))
             k += 2
             continue
         if (
             k + 2 < n
-            and re.fullmatch(r"[A-Za-z]{2,}", toks[k].text)
-            and toks[k + 1].text in {":", "-", "–", "—"}
+            and toks[k + 1].text in CODE_SEPARATORS
             and NUM_TOKEN_PAT.fullmatch(toks[k + 2].text)
         ):
             pairs.append((k, k + 2))
@@ -312,8 +769,10 @@ def _iter_code_pairs(toks: list[Tok]) -> list[tuple[int, int]]:
     return pairs
 
 
-def _cut_university(s: str) -> str:
-    up = s.upper()
+def _cut_university(s: str, up: str | None = None) -> str:
+    """Trim registrar/contact trailers off a university line. Pass `up` when already known."""
+    if up is None:
+        up = s.upper()
     # Hard stop tokens commonly appearing after the university name
     hard_tokens = (
         "TRANSCRIPT",
@@ -338,7 +797,7 @@ def _cut_university(s: str) -> str:
         if idx != -1:
             cutpoints.append(idx)
     # Also cut at the start of typical US phone numbers like (607) 753-4702 or 607-753-4702
-    m_phone = re.search(r"\(?\d{3}\)?[\s\-]\d{3}[\s\-]\d{4}", s)
+    m_phone = PHONE_PAT.search(s)
     if m_phone:
         cutpoints.append(m_phone.start())
     if cutpoints:
@@ -354,30 +813,40 @@ def _clean_student_name(s: str | None) -> str | None:
     if "@" in s:
         s = s.split("@", 1)[0]
     # Remove trailing parenthetical containing any digits (e.g., (730000018,T02302164))
-    s = re.sub(r"\s*\((?=[^)]*[0-9])[^)]*\)\s*$", "", s)
+    s = TRAILING_ID_PAREN_PAT.sub("", s)
     # Normalize spaces and strip commas/semicolons
-    s = re.sub(r"\s{2,}", " ", s).strip(" ,;")
+    s = " ".join(s.split()).strip(" ,;")
     return s or None
 
 
+def _university_score(s: str) -> int:
+    """Rank university candidates: SUNY base/campus parts and plausible lengths first."""
+    up = s.upper()
+    sc = sum(weight for term, weight in UNIVERSITY_SCORE_TERMS if term in up)
+    if 10 <= len(up) <= 90:
+        sc += 1
+    return sc
+
+
 def _extract_student_university(rows: list[Row]) -> tuple[str | None, str | None]:
-    window = [r for r in rows if r.page in (1, 2, 3, 4)]
-    joined = " \n".join(_row_text(r) for r in window)
-
-    NAME_PATS = [
-        re.compile(r"(?im)^\s*Record of:\s*(.+?)(?:\s*Page:.*$|$)"),
-        re.compile(r"(?im)^\s*Issued To:\s*([A-Z][A-Z\s.\-']+)\b.*$"),
-        re.compile(r"(?im)^\s*Student Name\s*:\s*(.+)$"),
-        re.compile(r"(?im)^\s*Name\s*:\s*(.+)$"),
-        re.compile(
-            r"(?im)^\s*([A-Z][A-Za-z'.\-]+,\s+[A-Z][A-Za-z'.\-]+)\s+\d{2,3}[- ]?\d{2}[- ]?\d{4}\b"
-        ),
-    ]
+    # Join each header-page row once; the name search and the university pass share the texts
+    window_texts = [_row_text(r) for r in rows if r.page in (1, 2, 3, 4)]
+    joined = " \n".join(window_texts)
+
+    joined_up = joined.upper()
+
     student = None
-    for pat in NAME_PATS:
+    for literal, pat in NAME_PATS:
+        if literal not in joined_up:
+            continue
         m = pat.search(joined)
         if m:
-            cand = m.group(1).strip()
+            cand = m.group(1)
+            if literal == RECORD_OF_LITERAL:
+                page = RECORD_OF_PAGE_PAT.search(cand, 1)
+                if page:
+                    cand = cand[: page.start()]
+            cand = cand.strip()
             if "@" in cand:
                 cand = cand.split("@")[0].strip()
                 if " " in cand:
@@ -385,50 +854,40 @@ def _extract_student_university(rows: list[Row]) -> tuple[str | None, str | None
             student = cand.strip(" ,;")
             break
 
-    def is_label_value(s: str) -> bool:
-        return bool(re.search(r"^[A-Z][A-Za-z &/]+\s:\s", s))
-
-    candidates: list[str] = []
-    for r in window:
-        txt = _row_text(r).strip()
+    # Headers repeat on every page; an ordered dict keeps first-seen order without duplicates
+    seen_candidates: dict[str, None] = {}
+    # SUNY-style names are split over two header lines ("State University of New York" +
+    # "College at Cortland"); spot both parts in the same pass that collects candidates.
+    base: str | None = None
+    addon: str | None = None
+    for raw in window_texts:
+        # UNIVERSITY_PAT is case-insensitive: most header rows are rejected by this one search
+        # before any uppercased copy is made
+        if not UNIVERSITY_PAT.search(raw):
+            continue
+        txt = raw.strip()
         up = txt.upper()
-        if "INSTITUTION INFORMATION CONTINUED" in up or is_label_value(txt):
+        if "INSTITUTION INFORMATION CONTINUED" in up or LABEL_VALUE_PAT.search(txt):
             continue
-        if re.search(r"(?i)\b(UNIVERSITY|COLLEGE|INSTITUTE|POLYTECHNIC|COMMUNITY COLLEGE)\b", up):
-            cut = _cut_university(txt)
-            if 6 <= len(cut) <= 200:
-                candidates.append(cut)
+        cut = _cut_university(txt, up)
+        if 6 <= len(cut) <= 200 and cut not in seen_candidates:
+            seen_candidates[cut] = None
+            cut_up = cut.upper()
+            if base is None and "STATE UNIVERSITY OF NEW YORK" in cut_up:
+                base = cut
+            if addon is None and ("COLLEGE AT" in cut_up or cut_up.endswith("CORTLAND")):
+                addon = cut
+    candidates = list(seen_candidates)
 
     full_name = None
-    base = next((c for c in candidates if "STATE UNIVERSITY OF NEW YORK" in c.upper()), None)
-    addon = next(
-        (c for c in candidates if "COLLEGE AT" in c.upper() or c.upper().endswith("CORTLAND")), None
-    )
     if base and addon and addon not in base:
         full_name = (base + " " + addon).strip()
 
-    def score(s: str) -> int:
-        up = s.upper()
-        sc = 0
-        if "STATE UNIVERSITY OF NEW YORK" in up:
-            sc += 4
-        if "COLLEGE AT" in up:
-            sc += 3
-        if "CORTLAND" in up:
-            sc += 2
-        if "UNIVERSITY" in up:
-            sc += 2
-        if "COLLEGE" in up:
-            sc += 1
-        if 10 <= len(up) <= 90:
-            sc += 1
-        return sc
-
     university = None
     if full_name:
         university = full_name
     elif candidates:
-        candidates.sort(key=score, reverse=True)
+        candidates.sort(key=_university_score, reverse=True)
         university = candidates[0]
 
     # Final cleanup for student (strip trailing IDs, emails, etc.)
@@ -437,6 +896,7 @@ def _extract_student_university(rows: list[Row]) -> tuple[str | None, str | None
     return student, university
 
 
+@functools.lru_cache(maxsize=4096)
 def _looks_like_title_word(s: str) -> bool:
     """Heuristic: a real title word often contains lowercase or is a long alpha token."""
     if any(ch.islower() for ch in s):
@@ -447,7 +907,7 @@ def _looks_like_title_word(s: str) -> bool:
 
 def _clean_title_prefix(s: str) -> str:
     # Remove common catalog prefixes like 'ST:', 'TOPICS:', etc.
-    s = re.sub(r"(?i)^(ST|SPECIAL\s+TOPICS|SELECTED\s+TOPICS|TOPICS)\s*[:\-]\s*", "", s).strip()
+    s = TITLE_PREFIX_PAT.sub("", s, count=1).strip()
     return s
 
 
@@ -462,13 +922,30 @@ def _title_column_x_per_page(rows: list[Row]) -> dict[int, float]:
         if "SUBJECT" in txt and "TITLE" in txt and "GRADE" in txt:
             # look for the specific token 'Title' to get its x0
             for t in r.toks:
-                if t.text.strip().upper() == "TITLE":
+                if t.up.strip() == "TITLE":
                     title_x[r.page] = t.x0
                     break
     return title_x
 
 
-def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str, str, str]]:
+def _is_in_progress_phrase(toks: list[Tok], idx: int) -> bool:
+    """True when toks[idx:idx + 2] spell 'IN PROGRESS'."""
+    return (
+        idx + 1 < len(toks)
+        and toks[idx].up.strip() == "IN"
+        and toks[idx + 1].up.strip() == "PROGRESS"
+    )
+
+
+def _grade_in_text(up: str) -> str | None:
+    """'IN PROGRESS' or the first letter grade in uppercased text, keeping a spaced +/-."""
+    if "IN PROGRESS" in up:
+        return "IN PROGRESS"
+    m = SPACED_GRADE_PAT.search(up)
+    return m.group(1) + (m.group(2) or "") if m else None
+
+
+def _scan_rows_for_courses(rows: list[Row], allowed: frozenset[str]) -> list[tuple[str, str, str]]:
     out: list[tuple[str, str, str]] = []
     n = len(rows)
     in_progress_seen_anywhere = False
@@ -476,17 +953,28 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
     # Precompute title header x0 per page (used to filter out Campus/Level columns)
     title_x_map = _title_column_x_per_page(rows)
 
-    def is_any_course_row(r: Row) -> bool:
-        return bool(_iter_code_pairs(r.toks))
+    # Each row's joined text, uppercased text and admin flag, built once: the stitch and grade
+    # windows revisit the same following rows for every course on a line
+    row_texts = [_row_text(r) for r in rows]
+    row_ups = [t.strip().upper() for t in row_texts]
+    row_admin = [_is_admin_row(t.strip(), up) for t, up in zip(row_texts, row_ups)]
+
+    # Code pairs per row index, computed at most once: the title stitch looks ahead at the
+    # same following rows for every course on a row, and again when they become current.
+    pair_cache: dict[int, list[tuple[int, int]]] = {}
+
+    def row_pairs(idx: int) -> list[tuple[int, int]]:
+        pairs = pair_cache.get(idx)
+        if pairs is None:
+            pairs = pair_cache[idx] = _iter_code_pairs(rows[idx].toks)
+        return pairs
 
     i = 0
     while i < n:
         row = rows[i]
-        txt = _row_text(row).strip()
-        up = txt.upper()
-        if INPROG_PAT.search(up):
+        if not in_progress_seen_anywhere and INPROG_PAT.search(row_ups[i]):
             in_progress_seen_anywhere = True
-        if _is_admin_row(txt):
+        if row_admin[i]:
             i += 1
             continue
 
@@ -495,16 +983,21 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
             i += 1
             continue
 
-        pairs = _iter_code_pairs(toks)
+        # Cheap prescan: a row without any allowed prefix token cannot yield a course here,
+        # so skip pair detection entirely (most header/summary rows)
+        if any(t.up in allowed for t in toks):
+            pairs = row_pairs(i)
+        else:
+            pairs = []
         used_any = False
         title_min_x = title_x_map.get(row.page, None)
 
-        for pi, num_idx in pairs:
-            prefix = toks[pi].text.upper()
+        for pair_idx, (pi, num_idx) in enumerate(pairs):
+            prefix = toks[pi].up
             if prefix not in allowed:
                 continue
             used_any = True
-            number = toks[num_idx].text.upper()
+            number = toks[num_idx].up
             code = f"{prefix} {number}"
             code_x0 = toks[pi].x0
             code_end_x = toks[num_idx].x1
@@ -513,51 +1006,38 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
             title_left_x: float | None = None
             credits_x0: float | None = None
 
-            next_pair_x0 = None
-            for p2, _n2 in pairs:
-                if p2 > pi:
-                    next_pair_x0 = toks[p2].x0
-                    break
-
-            def is_in_progress_phrase(ntoks: list[Tok], idx: int) -> bool:
-                return (
-                    idx + 1 < len(ntoks)
-                    and ntoks[idx].text.strip().upper() == "IN"
-                    and ntoks[idx + 1].text.strip().upper() == "PROGRESS"
-                )
+            # pairs are ordered left-to-right, so the next course starts at the adjacent pair
+            next_pi = pairs[pair_idx + 1][0] if pair_idx + 1 < len(pairs) else len(toks)
+            next_pair_x0 = toks[next_pi].x0 if next_pi < len(toks) else None
 
             # ----- same row title scan -----
-            right = toks[num_idx + 1 :]
+            right = toks[num_idx + 1 : next_pi]
             started_title = False
             for t_idx, t in enumerate(right):
                 if t.x0 <= code_end_x + 1:
                     continue
                 if next_pair_x0 is not None and t.x0 >= next_pair_x0 - 1:
                     break
-                if t.text.strip().upper() in FLAG_SINGLE_LETTERS:
+                up_tok = t.up.strip()
+                if up_tok in FLAG_SINGLE_LETTERS:
                     continue
-                up_tok = t.text.strip().upper()
                 if (
                     _is_stop_token(t.text)
-                    or LEVEL_TOKEN.fullmatch(t.text)
+                    or t.up in LEVEL_TOKENS
                     or URL_PAT.search(t.text)
-                    or is_in_progress_phrase(right, t_idx)
+                    or _is_in_progress_phrase(right, t_idx)
                 ) and started_title:
                     break
-                if started_title and (
-                    GRADE_TOKEN_STRICT.fullmatch(t.text) or GRADE_TOKEN_LOOSE.fullmatch(t.text)
-                ):
+                if started_title and (t.up in STRICT_GRADES or t.up in LOOSE_GRADES):
                     break
                 # Skip campus/mode/level *before* the title begins
-                if not started_title and (
-                    up_tok in PRETITLE_TOKENS or LEVEL_TOKEN.fullmatch(t.text)
-                ):
+                if not started_title and (up_tok in PRETITLE_TOKENS or t.up in LEVEL_TOKENS):
                     continue
                 # Enforce a minimum x0 at the Title header, if known
                 if title_min_x is not None and t.x0 < title_min_x - 1:
                     continue
                 # detect credits position
-                if re.fullmatch(r"\d+\.\d{2,3}", t.text):
+                if _is_credits(t.text):
                     credits_x0 = t.x0
                     break
                 if title_left_x is None:
@@ -573,14 +1053,15 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
             joined_rows = 0
             while j < n and joined_rows < 3:
                 next_row = rows[j]
-                ntext = _row_text(next_row).strip()
-                if _is_admin_row(ntext) or is_any_course_row(next_row):
+                if row_admin[j] or row_pairs(j):
                     break
                 ntoks = next_row.toks
-                right_tokens = [t for t in ntoks if t.x0 > code_end_x + 1]
-                # Filter to Title column (if known)
+                # Row tokens are x-sorted: the tokens right of the code (and at or past the
+                # Title column, if known) are a suffix, found by bisection instead of filtering
+                start = bisect.bisect_right(ntoks, code_end_x + 1, key=_tok_x0)
                 if title_min_x is not None:
-                    right_tokens = [t for t in right_tokens if t.x0 >= title_min_x - 1]
+                    start = max(start, bisect.bisect_left(ntoks, title_min_x - 1, key=_tok_x0))
+                right_tokens = ntoks[start:]
                 # Keep only tokens aligned with the initial title column
                 aligned = []
                 if title_left_x is not None:
@@ -589,8 +1070,6 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
                             aligned.append(t)
                 if not aligned:
                     break
-                if title_min_x is not None:
-                    right_tokens = [t for t in right_tokens if t.x0 >= title_min_x - 1]
                 if not right_tokens:
                     j += 1
                     continue
@@ -599,24 +1078,24 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
                     break
                 stop_hit = False
                 for k, t in enumerate(aligned):
-                    if t.text.strip().upper() in FLAG_SINGLE_LETTERS:
+                    if t.up.strip() in FLAG_SINGLE_LETTERS:
                         continue
                     if (
                         _is_stop_token(t.text)
-                        or LEVEL_TOKEN.fullmatch(t.text)
+                        or t.up in LEVEL_TOKENS
                         or URL_PAT.search(t.text)
-                        or GRADE_TOKEN_STRICT.fullmatch(t.text)
-                        or GRADE_TOKEN_LOOSE.fullmatch(t.text)
+                        or t.up in STRICT_GRADES
+                        or t.up in LOOSE_GRADES
                     ):
                         stop_hit = True
                         break
                     if k + 1 < len(right_tokens):
-                        a = t.text.strip().upper()
-                        b = right_tokens[k + 1].text.strip().upper()
+                        a = t.up.strip()
+                        b = right_tokens[k + 1].up.strip()
                         if a == "IN" and b == "PROGRESS":
                             stop_hit = True
                             break
-                    if re.fullmatch(r"\d+\.\d{2,3}", t.text):
+                    if _is_credits(t.text):
                         credits_x0 = credits_x0 or t.x0
                         stop_hit = True
                         break
@@ -633,148 +1112,181 @@ def _scan_rows_for_courses(rows: list[Row], allowed: set[str]) -> list[tuple[str
                 if credits_x0 is None:
                     return None
                 region_tokens = [
-                    t
-                    for t in start_row.toks
-                    if t.x0 > credits_x0 - 1 and not LEVEL_TOKEN.fullmatch(t.text)
+                    t for t in start_row.toks if t.x0 > credits_x0 - 1 and t.up not in LEVEL_TOKENS
                 ]
                 for t in region_tokens:
-                    if GRADE_TOKEN_STRICT.fullmatch(t.text):
-                        return t.text.upper().replace("\u2212", "-")
+                    if t.up in STRICT_GRADES:
+                        return t.up.replace("\u2212", "-")
                 joined = " ".join(t.text for t in region_tokens).upper().replace("\u2212", "-")
-                if "IN PROGRESS" in joined:
-                    return "IN PROGRESS"
-                # regex variant that preserves +/- even with spaces
-                m = re.search(r"(?<!\w)(A|B|C|D|F)\s*([+\-])?(?!\w)", joined)
-                if m:
-                    return (m.group(1) + (m.group(2) or "")).upper()
+                spaced = _grade_in_text(joined)
+                if spaced:
+                    return spaced
                 for t in region_tokens:
-                    if GRADE_TOKEN_LOOSE.fullmatch(t.text):
-                        return t.text.upper()
+                    if t.up in LOOSE_GRADES:
+                        return t.up
                 return None
 
             def grade_left_of_code(start_row: Row) -> str | None:
                 left_tokens = [t for t in start_row.toks if t.x1 < code_x0 - 1]
-                ignore = {
-                    "GRD",
-                    "GR",
-                    "CR",
-                    "CRED",
-                    "CRED:",
-                    "CREDIT",
-                    "CREDITS",
-                    "PTS",
-                    "R",
-                    "HRS",
-                    "HOURS",
-                }
                 for t in left_tokens:
-                    if t.text.strip().upper().rstrip(":") in ignore:
+                    if t.up.strip().rstrip(":") in GRADE_LABEL_TOKENS:
                         continue
-                    if GRADE_TOKEN_STRICT.fullmatch(t.text):
-                        return t.text.upper().replace("\u2212", "-")
+                    if t.up in STRICT_GRADES:
+                        return t.up.replace("\u2212", "-")
                 joined_left = " ".join(t.text for t in left_tokens).upper().replace("\u2212", "-")
-                if "IN PROGRESS" in joined_left:
-                    return "IN PROGRESS"
-                m = re.search(r"(?<!\w)(A|B|C|D|F)\s*([+\-])?(?!\w)", joined_left)
-                if m:
-                    return (m.group(1) + (m.group(2) or "")).upper()
+                spaced = _grade_in_text(joined_left)
+                if spaced:
+                    return spaced
                 for t in left_tokens:
-                    if GRADE_TOKEN_LOOSE.fullmatch(t.text):
-                        return t.text.upper()
+                    if t.up in LOOSE_GRADES:
+                        return t.up
                 return None
 
             grade = strict_grade_right_of_credits(row) or grade_left_of_code(row)
             if not grade:
-                window = (
-                    " ".join(_row_text(r) for r in rows[i : i + 3]).upper().replace("\u2212", "-")
-                )
-                # preserve +/- even with spaces
-                if "IN PROGRESS" in window:
-                    grade = "IN PROGRESS"
-                else:
-                    m = re.search(r"(?<!\w)(A|B|C|D|F)\s*([+\-])?(?!\w)", window)
-                    grade = (m.group(1) + (m.group(2) or "")).upper() if m else "none"
+                window = " ".join(row_texts[i : i + 3]).upper().replace("\u2212", "-")
+                grade = _grade_in_text(window) or "none"
 
             out.append((code, title, grade))
 
-        # Cross-row stitch (only if no allowed pair used on this row)
-        if not used_any:
-            if i + 1 < n and not _is_admin_row(_row_text(rows[i + 1])):
-                last = toks[-1]
-                if re.fullmatch(r"[A-Za-z]{2,}", last.text):
-                    ntoks = rows[i + 1].toks
-                    if ntoks and NUM_TOKEN_PAT.fullmatch(ntoks[0].text):
-                        prefix = last.text.upper()
-                        number = ntoks[0].text.upper()
-                        if prefix in allowed:
-                            code = f"{prefix} {number}"
-                            code_end_x = ntoks[0].x1
-                            credits_x0 = None
-                            title_tokens = []
-                            started_title = False
-                            x_title_left: float | None = None
-                            title_min_x = title_x_map.get(rows[i + 1].page, None)
-                            for t in ntoks[1:]:
-                                if t.x0 <= code_end_x + 1:
-                                    continue
-                                up_tok = t.text.strip().upper()
-                                if t.text.strip().upper() in FLAG_SINGLE_LETTERS:
-                                    continue
-                                if (
-                                    _is_stop_token(t.text)
-                                    or LEVEL_TOKEN.fullmatch(t.text)
-                                    or URL_PAT.search(t.text)
-                                ):
-                                    break
-                                if title_min_x is not None and t.x0 < title_min_x - 1:
-                                    continue
-                                if re.fullmatch(r"\d+\.\d{2,3}", t.text):
-                                    credits_x0 = t.x0
-                                    break
-                                if x_title_left is None:
-                                    x_title_left = t.x0
-                                if not started_title:
-                                    started_title = _looks_like_title_word(t.text)
-                                    if not started_title and up_tok in {"ST", "ST:"}:
-                                        continue
-                                title_tokens.append(t.text)
-                            title = " ".join(title_tokens).strip(" -:;,")
-                            title = _clean_title_prefix(title)
-                            grade = None
-                            if credits_x0 is not None:
-                                reg = [
-                                    t
-                                    for t in ntoks
-                                    if t.x0 > credits_x0 - 1 and not LEVEL_TOKEN.fullmatch(t.text)
-                                ]
-                                for t in reg:
-                                    if GRADE_TOKEN_STRICT.fullmatch(t.text):
-                                        grade = t.text.upper().replace("\u2212", "-")
-                                        break
-                                if (
-                                    not grade
-                                    and "IN PROGRESS" in " ".join(t.text for t in reg).upper()
-                                ):
-                                    grade = "IN PROGRESS"
-                            out.append((code, title, grade or "none"))
+        # Cross-row stitch (only if no allowed pair used on this row). The allowed-prefix
+        # lookup gates first: the admin-row check joins and regex-scans the whole next row.
+        if not used_any and i + 1 < n:
+            last = toks[-1]
+            prefix = last.up
+            if prefix in allowed and _is_alpha_prefix(last.text) and not row_admin[i + 1]:
+                ntoks = rows[i + 1].toks
+                if ntoks and NUM_TOKEN_PAT.fullmatch(ntoks[0].text):
+                    number = ntoks[0].up
+                    code = f"{prefix} {number}"
+                    code_end_x = ntoks[0].x1
+                    credits_x0 = None
+                    title_tokens = []
+                    started_title = False
+                    x_title_left: float | None = None
+                    title_min_x = title_x_map.get(rows[i + 1].page, None)
+                    for t in ntoks[1:]:
+                        if t.x0 <= code_end_x + 1:
+                            continue
+                        up_tok = t.up.strip()
+                        if up_tok in FLAG_SINGLE_LETTERS:
+                            continue
+                        if _is_stop_token(t.text) or t.up in LEVEL_TOKENS or URL_PAT.search(t.text):
+                            break
+                        if title_min_x is not None and t.x0 < title_min_x - 1:
+                            continue
+                        if _is_credits(t.text):
+                            credits_x0 = t.x0
+                            break
+                        if x_title_left is None:
+                            x_title_left = t.x0
+                        if not started_title:
+                            started_title = _looks_like_title_word(t.text)
+                            if not started_title and up_tok in {"ST", "ST:"}:
+                                continue
+                        title_tokens.append(t.text)
+                    title = " ".join(title_tokens).strip(" -:;,")
+                    title = _clean_title_prefix(title)
+                    grade = None
+                    if credits_x0 is not None:
+                        reg = [
+                            t for t in ntoks if t.x0 > credits_x0 - 1 and t.up not in LEVEL_TOKENS
+                        ]
+                        for t in reg:
+                            if t.up in STRICT_GRADES:
+                                grade = t.up.replace("\u2212", "-")
+                                break
+                        if not grade and "IN PROGRESS" in " ".join(t.text for t in reg).upper():
+                            grade = "IN PROGRESS"
+                    out.append((code, title, grade or "none"))
 
         i += 1
 
     if in_progress_seen_anywhere:
         out = [(c, t, g if g != "none" else "IN PROGRESS") for (c, t, g) in out]
-    return out
+    # Repeated page headers and stitched rows can yield the same course twice; dict.fromkeys
+    # drops exact duplicates while keeping first-seen order
+    return list(dict.fromkeys(out))
+
+
+# (course matches, (student, university), OCR fallback used) for one input file
+FileResult = tuple[list[tuple[str, str, str]], tuple[str | None, str | None], bool]
 
 
 def run_file(
-    path: Path, subjects: list[str], prefer_ocr: bool = False
-) -> tuple[list[tuple[str, str, str]], tuple[str | None, str | None], bool]:
-    allowed = _allowed_set(subjects)
-    rows, ocr_used = _extract_rows(path, prefer_ocr=prefer_ocr)
+    path: Path,
+    subjects: list[str],
+    prefer_ocr: bool = False,
+    skip_ocr: bool = False,
+    ocr_dpi: int = OCR_DPI,
+    page_workers: int = 0,
+    quiet_pdf_logs: bool = True,
+) -> FileResult:
+    allowed = _allowed_set(tuple(subjects))
+    rows, ocr_used = _extract_rows(
+        path,
+        prefer_ocr=prefer_ocr,
+        skip_ocr=skip_ocr,
+        ocr_dpi=ocr_dpi,
+        page_workers=page_workers,
+        quiet_pdf_logs=quiet_pdf_logs,
+    )
     matches = _scan_rows_for_courses(rows, allowed)
+    if (
+        ocr_used
+        and not matches
+        and ocr_dpi < OCR_RETRY_DPI
+        and not any(_iter_code_pairs(r.toks) for r in rows)
+    ):
+        # A low-resolution pass that read no course codes of any subject: retry at full
+        # resolution. Codes in other subjects mean the scan is legible; don't OCR it twice.
+        retry_rows = _extract_rows_ocr(path, dpi=OCR_RETRY_DPI)
+        if retry_rows:
+            rows = retry_rows
+            matches = _scan_rows_for_courses(rows, allowed)
     student, university = _extract_student_university(rows)
     return matches, (student, university), ocr_used
 
 
+@functools.lru_cache(maxsize=1024)
+def _course_sort_key(code: str) -> tuple[int, str]:
+    """Order codes by course number, then suffix letter; codes without a number go last."""
+    m = CODE_NUMBER_PAT.search(code)
+    return (int(m.group(1)) if m else 9999, m.group(2) if m else "")
+
+
+def _print_result(path: Path, result: FileResult, subjects: list[str], verbose: bool) -> None:
+    """Print one file's parsed student, university and sorted course lines."""
+    base = path.name
+    matches, (student, university), ocr_used = result
+
+    # Final presentation cleanup for student (safety net)
+    student = _clean_student_name(student)
+
+    # Collect the whole block and write it once instead of one print() per line
+    out = [
+        f"Results for {base}",
+        f"  Student: {student or '(unknown)'}",
+        f"  University: {university or '(unknown)'}",
+    ]
+
+    entries: list[tuple[tuple[int, str], str]] = [
+        (_course_sort_key(code), f"  {code} — {title} — grade: {grade}")
+        for code, title, grade in matches
+    ]
+
+    if not entries:
+        out.append(" [no course codes detected]")
+    else:
+        out.extend(line for _k, line in sorted(entries, key=lambda t: t[0]))
+
+    if verbose:
+        out.append(f"[verbose] fallback_ocr_activated: {ocr_used}")
+
+    out.append(f"Parsed {base} (subjects: {', '.join(subjects)})")
+    sys.stdout.write("\n".join(out) + "\n")
+
+
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(prog="transcript-parser")
     parser.add_argument("inputs", nargs="+", help="PDF file(s)")
@@ -783,51 +1295,70 @@ def main(argv: list[str] | None = None) -> None:
     )
     parser.add_argument("--out", default=None, help="Optional JSON output path (unused here)")
     parser.add_argument("--verbose", action="store_true", help="Print detection details (OCR flag)")
-    parser.add_argument(
+    ocr_mode = parser.add_mutually_exclusive_group()
+    ocr_mode.add_argument(
         "--force-ocr",
         action="store_true",
         help="Force PaddleOCR fallback even if pdfplumber succeeds",
     )
+    ocr_mode.add_argument(
+        "--skip-ocr",
+        action="store_true",
+        help="Never run the PaddleOCR fallback (image-only PDFs then yield no rows)",
+    )
+    parser.add_argument(
+        "--verbose-pdf",
+        action="store_true",
+        help="Let pdfminer/pdfplumber log below ERROR (silenced by default for speed)",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=0,
+        help="Parse PDF pages in N worker processes (default 0 = off; with --jobs, capped "
+        "at each file worker's share of the CPUs)",
+    )
+    parser.add_argument(
+        "--ocr-dpi",
+        type=int,
+        default=OCR_DPI,
+        help=f"Render resolution for the OCR fallback (default {OCR_DPI}; "
+        f"re-run at {OCR_RETRY_DPI} when no course codes are found)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse input files in N worker processes (default 1 = serial, 0 = one per CPU)",
+    )
     args = parser.parse_args(argv if argv is not None else sys.argv[1:])
-
-    for inp in args.inputs:
-        p = Path(inp)
-        base = p.name
-        print(f"Results for {base}")
-
-        matches, (student, university), ocr_used = run_file(
-            p, args.subjects, prefer_ocr=args.force_ocr
-        )
-
-        # Final presentation cleanup for student (safety net)
-        student = _clean_student_name(student)
-
-        print(f"  Student: {student or '(unknown)'}")
-        print(f"  University: {university or '(unknown)'}")
-
-        def sort_key(code: str):
-            m = re.search(r"(\d{3,4})([A-Z]?)$", code)
-            return (int(m.group(1)) if m else 9999, m.group(2) if m else "")
-
-        seen = set()
-        entries: list[tuple[tuple[int, str], str]] = []
-        for code, title, grade in matches:
-            key = (code, title, grade)
-            if key in seen:
-                continue
-            seen.add(key)
-            entries.append((sort_key(code), f"  {code} — {title} — grade: {grade}"))
-
-        if not entries:
-            print(" [no course codes detected]")
-        else:
-            for _k, line in sorted(entries, key=lambda t: t[0]):
-                print(line)
-
-        if args.verbose:
-            print(f"[verbose] fallback_ocr_activated: {ocr_used}")
-
-        print(f"Parsed {base} (subjects: {', '.join(args.subjects)})")
+    _quiet_pdf_loggers(not args.verbose_pdf)
+
+    paths = [Path(inp) for inp in args.inputs]
+    parse = functools.partial(
+        run_file,
+        subjects=args.subjects,
+        prefer_ocr=args.force_ocr,
+        skip_ocr=args.skip_ocr,
+        ocr_dpi=args.ocr_dpi,
+        page_workers=args.page_workers,
+        quiet_pdf_logs=not args.verbose_pdf,
+    )
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if jobs > 1 and len(paths) > 1:
+        # Files are independent: parse them in worker processes, print in input order.
+        # Each worker builds its own PaddleOCR engine once (lru_cache) and reuses it.
+        workers = min(jobs, len(paths))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_file_worker,
+            initargs=(not args.verbose_pdf, workers),
+        ) as ex:
+            for p, result in zip(paths, ex.map(parse, paths)):
+                _print_result(p, result, args.subjects, args.verbose)
+    else:
+        for p in paths:
+            _print_result(p, parse(p), args.subjects, args.verbose)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,304 @@
+import logging
+from pathlib import Path
+
+import pytest
+from reportlab.pdfgen import canvas  # type: ignore
+
+from transcript_parser import parse_transcript
+from transcript_parser.parse_transcript import (
+    Row,
+    Tok,
+    _allowed_set,
+    _clean_student_name,
+    _extract_rows,
+    _extract_rows_ocr,
+    _extract_rows_pdfplumber,
+    _extract_student_university,
+    _init_file_worker,
+    _is_alpha_prefix,
+    _is_credits,
+    _load_ocr_cache,
+    _normalize_text,
+    _ocr_cache_path,
+    _ocr_cpu_threads,
+    _ocr_engine_name,
+    _page_worker_count,
+    _quiet_pdf_loggers,
+    _render_pages_pymupdf,
+    _row_text,
+    _save_ocr_cache,
+    _scan_rows_for_courses,
+)
+
+
+def _row(page: int, y: float, text: str) -> Row:
+    """Build a Row whose tokens are the space-separated words of `text`, 10pt apart."""
+    toks = [Tok(w, 10.0 * i, 10.0 * i + 8, y, y + 8, page) for i, w in enumerate(text.split())]
+    return Row(page, y, toks)
+
+
+def test_allowed_set_expands_aliases():
+    allowed = _allowed_set(("math", "cs"))
+    assert {"MATH", "MTH", "STAT", "CSCI"} <= allowed
+    assert "PHYS" not in allowed
+
+
+def test_allowed_set_unknown_subject_is_uppercased():
+    assert _allowed_set(("hist",)) == frozenset({"HIST"})
+
+
+def test_allowed_set_is_memoized():
+    assert _allowed_set(("math",)) is _allowed_set(("math",))
+
+
+def test_clean_student_name_strips_ids_and_spaces():
+    assert _clean_student_name("Doe,  Jane (730000018,T02302164)") == "Doe, Jane"
+    assert _clean_student_name("jane@example.edu") == "jane"
+    assert _clean_student_name("") == ""
+    assert _clean_student_name(None) is None
+
+
+def _make_multipage_pdf(path: Path, pages: int) -> None:
+    c = canvas.Canvas(str(path))
+    c.setFont("Helvetica", 12)
+    for i in range(pages):
+        c.drawString(72, 720, f"MATH {101 + i} Calculus Part {i} A")
+        c.drawString(72, 700, f"CS {201 + i} Programming B+")
+        c.showPage()
+    c.save()
+
+
+def test_extract_rows_multiprocess_matches_serial(tmp_path):
+    pdf = tmp_path / "multi.pdf"
+    _make_multipage_pdf(pdf, pages=5)
+    serial = _extract_rows_pdfplumber(pdf)
+    processes = _extract_rows_pdfplumber(pdf, workers=2)
+    assert [(r.page, _row_text(r)) for r in processes] == [(r.page, _row_text(r)) for r in serial]
+    assert {r.page for r in serial} == {1, 2, 3, 4, 5}
+
+
+def test_page_workers_start_with_the_callers_pdf_log_level(tmp_path, monkeypatch):
+    pdf = tmp_path / "multi.pdf"
+    _make_multipage_pdf(pdf, pages=2)
+    pool_kwargs: dict = {}
+    real_pool = parse_transcript.ProcessPoolExecutor
+
+    def recording_pool(**kwargs):
+        pool_kwargs.update(kwargs)
+        return real_pool(**kwargs)
+
+    monkeypatch.setattr(parse_transcript, "ProcessPoolExecutor", recording_pool)
+    assert _extract_rows_pdfplumber(pdf, workers=2, quiet_pdf_logs=False)
+    assert pool_kwargs["initializer"] is _quiet_pdf_loggers
+    assert pool_kwargs["initargs"] == (False,)
+
+
+def test_ocr_cache_round_trip_feeds_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake scan")
+    cache_file = _ocr_cache_path(pdf, _ocr_engine_name(), "en", 300)
+    assert cache_file is not None and cache_file.parent.parent.name == "transcript_parser"
+    tokens = [(1, "Calculus", 120.0, 50.0, 180.0, 60.0), (1, "MATH", 10.0, 52.0, 50.0, 62.0)]
+    _save_ocr_cache(cache_file, tokens)
+    assert _load_ocr_cache(cache_file) == tokens
+
+    rows = _extract_rows_ocr(pdf)
+    assert [_row_text(r) for r in rows] == ["MATH Calculus"]
+
+
+def test_ocr_rows_group_tokens_across_y_buckets(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4 dense scan")
+    # y_tol is 6 px at 300 dpi: 11.9 and 13.0 straddle a bucket edge but share a row
+    tokens = [
+        (1, "Algebra", 120.0, 13.0, 180.0, 20.0),
+        (1, "MATH", 10.0, 11.9, 50.0, 19.0),
+        (1, "241", 60.0, 12.5, 90.0, 19.0),
+        (1, "A", 300.0, 40.0, 310.0, 47.0),
+        (2, "CS", 10.0, 5.0, 30.0, 12.0),
+    ]
+    _save_ocr_cache(_ocr_cache_path(pdf, _ocr_engine_name(), "en", 300), tokens)
+    rows = _extract_rows_ocr(pdf)
+    assert [(r.page, _row_text(r)) for r in rows] == [(1, "MATH 241 Algebra"), (1, "A"), (2, "CS")]
+
+
+def test_ocr_cache_key_depends_on_engine_and_dpi_and_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"abc")
+    assert _ocr_cache_path(pdf, "paddle", "en", 200) != _ocr_cache_path(pdf, "paddle", "en", 300)
+    assert _ocr_cache_path(pdf, "rapid", "en", 300) != _ocr_cache_path(pdf, "paddle", "en", 300)
+    monkeypatch.setenv("TRANSCRIPT_OCR_ENGINE", "paddle")
+    assert _ocr_engine_name() == "paddle"
+    monkeypatch.setenv("TRANSCRIPT_OCR_CACHE", "0")
+    assert _ocr_cache_path(pdf, _ocr_engine_name(), "en", 300) is None
+
+
+def test_ocr_cache_missing_or_corrupt_is_a_miss(tmp_path):
+    assert _load_ocr_cache(None) is None
+    assert _load_ocr_cache(tmp_path / "absent.json") is None
+    bad = tmp_path / "bad.json"
+    bad.write_text("{not json", encoding="utf-8")
+    assert _load_ocr_cache(bad) is None
+
+
+def test_skip_ocr_never_calls_ocr_on_textless_pdf(tmp_path, monkeypatch):
+    pdf = tmp_path / "blank.pdf"
+    c = canvas.Canvas(str(pdf))
+    c.rect(72, 72, 100, 100)
+    c.save()
+
+    def boom(*_args: object, **_kwargs: object) -> list:
+        raise AssertionError("OCR must not run with skip_ocr")
+
+    monkeypatch.setattr(parse_transcript, "_extract_rows_ocr", boom)
+    assert _extract_rows(pdf, skip_ocr=True) == ([], False)
+
+
+def test_pdf_loggers_quiet_by_default_and_restorable():
+    assert logging.getLogger("pdfminer").level == logging.ERROR
+    try:
+        _quiet_pdf_loggers(False)
+        assert logging.getLogger("pdfminer").level == logging.NOTSET
+        assert logging.getLogger("pdfplumber").level == logging.NOTSET
+    finally:
+        _quiet_pdf_loggers()
+    assert logging.getLogger("pdfplumber").level == logging.ERROR
+
+
+def test_file_worker_splits_ocr_threads_and_page_workers_across_the_pool(monkeypatch):
+    monkeypatch.setattr(parse_transcript.os, "cpu_count", lambda: 8)
+    assert _ocr_cpu_threads() == 8
+    assert _page_worker_count(12) == 12
+    try:
+        _init_file_worker(True, 4)
+        assert _ocr_cpu_threads() == 2
+        assert _page_worker_count(8) == 2 and _page_worker_count(0) == 0
+        _init_file_worker(True, 16)
+        assert _ocr_cpu_threads() == 1
+        assert _page_worker_count(4) == 1
+    finally:
+        _init_file_worker(True, 1)
+
+
+def test_student_university_joins_split_suny_header():
+    rows = [
+        _row(1, 10, "State University of New York"),
+        _row(1, 20, "College at Cortland Registrar (607) 753-4702"),
+        _row(1, 30, "Record of: Doe, Jane (730000018) Page: 1"),
+        _row(2, 10, "State University of New York"),
+    ]
+    student, university = _extract_student_university(rows)
+    assert student == "Doe, Jane"
+    assert university == "State University of New York College at Cortland"
+
+
+def test_record_of_page_suffix_is_cut_in_any_case_only_for_record_of():
+    rows = [_row(1, 10, "RECORD OF: DOE, JANE PAGE: 1")]
+    assert _extract_student_university(rows)[0] == "DOE, JANE"
+    assert _extract_student_university([_row(1, 10, "Name: Page: Smith")])[0] == "Page: Smith"
+
+
+def test_student_university_unknown_when_absent():
+    assert _extract_student_university([_row(1, 10, "MATH 101 Calculus A")]) == (None, None)
+
+
+def test_main_jobs_prints_results_in_input_order(tmp_path, capsys):
+    pdfs = []
+    for n in (3, 1, 2):
+        pdf = tmp_path / f"t{n}.pdf"
+        _make_multipage_pdf(pdf, pages=n)
+        pdfs.append(str(pdf))
+    parse_transcript.main([*pdfs, "--subjects", "math", "cs"])
+    serial = capsys.readouterr().out
+    parse_transcript.main([*pdfs, "--subjects", "math", "cs", "--jobs", "3"])
+    assert capsys.readouterr().out == serial
+    assert serial.index("t3.pdf") < serial.index("t1.pdf") < serial.index("t2.pdf")
+
+
+def test_scan_stitches_code_split_across_rows():
+    rows = [_row(1, 10, "Fall 2021 MATH"), _row(1, 20, "241 Linear Algebra 3.00 A-")]
+    assert _scan_rows_for_courses(rows, _allowed_set(("math",))) == [
+        ("MATH 241", "Linear Algebra", "A-")
+    ]
+    assert _scan_rows_for_courses(rows, _allowed_set(("cs",))) == []
+
+
+def test_scan_drops_repeated_courses_keeping_order():
+    rows = [
+        _row(1, 10, "MATH 241 Linear Algebra 3.00 A-"),
+        _row(1, 30, "MATH 101 Calculus 3.00 B"),
+        _row(2, 10, "MATH 241 Linear Algebra 3.00 A-"),
+    ]
+    assert _scan_rows_for_courses(rows, _allowed_set(("math",))) == [
+        ("MATH 241", "Linear Algebra", "A-"),
+        ("MATH 101", "Calculus", "B"),
+    ]
+
+
+def test_normalize_text_maps_nbsp_and_dashes():
+    assert _normalize_text("A− B\xa0C–D—E") == "A- B C-D-E"
+
+
+def test_run_file_retries_ocr_at_full_resolution_when_no_courses(tmp_path, monkeypatch):
+    pdf = tmp_path / "scan.pdf"
+    c = canvas.Canvas(str(pdf))
+    c.rect(72, 72, 100, 100)
+    c.save()
+    dpis: list[int] = []
+
+    def fake_ocr(_path: Path, dpi: int = 300) -> list[Row]:
+        dpis.append(dpi)
+        return [_row(1, 10, "MATH 241 Linear Algebra 3.00 A" if dpi >= 300 else "blurred")]
+
+    monkeypatch.setattr(parse_transcript, "_extract_rows_ocr", fake_ocr)
+    matches, _names, ocr_used = parse_transcript.run_file(pdf, ["math"])
+    assert dpis == [200, 300]
+    assert ocr_used and matches == [("MATH 241", "Linear Algebra", "A")]
+
+    # A legible first pass with only other subjects' codes is not OCR'd again
+    monkeypatch.setattr(
+        parse_transcript,
+        "_extract_rows_ocr",
+        lambda _path, dpi=300: dpis.append(dpi) or [_row(1, 10, "HIST 101 World History B")],
+    )
+    dpis.clear()
+    assert parse_transcript.run_file(pdf, ["math"])[0] == []
+    assert dpis == [200]
+
+
+def test_pymupdf_renders_grayscale_pages_at_requested_dpi(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    pdf = tmp_path / "multi.pdf"
+    _make_multipage_pdf(pdf, pages=2)
+    pages = list(_render_pages_pymupdf(pymupdf, pdf, dpi=72))
+    assert [p for p, _img in pages] == [1, 2]
+    img = pages[0][1]
+    # reportlab's default page is A4 (595.3 x 841.9 pt): one pixel per point at 72 dpi
+    assert img.shape == (842, 596) and img.dtype.name == "uint8"
+    assert img.min() < 128 < img.max()
+
+
+def test_row_text_is_joined_once():
+    row = _row(1, 10, "MATH 241 Linear Algebra")
+    assert row.text is None
+    assert _row_text(row) == "MATH 241 Linear Algebra"
+    assert _row_text(row) is row.text
+    assert row.toks[0].up == "MATH" and row.toks[2].up == "LINEAR"
+
+
+def test_pymupdf_render_errors_yield_no_pages(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    bad = tmp_path / "corrupt.pdf"
+    bad.write_bytes(b"not a pdf at all")
+    assert list(_render_pages_pymupdf(pymupdf, bad, dpi=72)) == []
+    assert list(_render_pages_pymupdf(pymupdf, tmp_path / "missing.pdf", dpi=72)) == []
+
+
+def test_token_shape_predicates():
+    assert _is_alpha_prefix("MATH") and _is_alpha_prefix("cs")
+    assert not any(map(_is_alpha_prefix, ["M", "M1", "ÄB", ""]))
+    assert _is_credits("3.00") and _is_credits("12.345")
+    assert not any(map(_is_credits, ["3.0", "3.0000", ".00", "3.", "3", "x3.00"]))
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import logging
 import re
+import sys
 from collections.abc import Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from re import Pattern
 
-try:
-    import pdfplumber  # type: ignore
-except Exception:
-    pdfplumber = None  # type: ignore
+import numpy as np
 
+# Keep pdfminer's DEBUG chatter (and its per-record cost) out of dumps unless --verbose-pdf
+for _name in ("pdfminer", "pdfplumber"):
+    logging.getLogger(_name).setLevel(logging.ERROR)
 
-@dataclass
+
+_fmt_tok = "   - {!r} @ x0={:.1f}..{:.1f} y={:.1f}\n".format
+_SEPARATOR = "-" * 60 + "\n"
+
+
+@dataclass(slots=True)
 class Token:
     text: str
     x0: float
@@ -22,25 +30,14 @@ class Token:
     y1: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Row:
     y: float
     toks: list[Token]
 
 
-def _to_str(v: object) -> str:
-    s = "" if v is None else str(v)
-    return s.strip()
-
-
-def _to_float(v: object, default: float = 0.0) -> float:
-    try:
-        return float(v)  # type: ignore[arg-type]
-    except Exception:
-        return default
-
-
-def parse_pages_arg(p: str | None) -> set[int] | None:
+@functools.lru_cache(maxsize=8)
+def parse_pages_arg(p: str | None) -> frozenset[int] | None:
     if not p:
         return None
     parts: list[int] = []
@@ -61,31 +58,40 @@ def parse_pages_arg(p: str | None) -> set[int] | None:
                 parts.append(int(chunk_s))
             except ValueError:
                 continue
-    return set(parts)
+    return frozenset(parts)
 
 
 def group_words_into_rows(words: Sequence[dict], y_tol: float = 3.0) -> list[Row]:  # type: ignore[type-arg]
-    rows: list[Row] = []
-    cur: Row | None = None
+    """
+    Group words into rows whose tops lie within y_tol of the row's first word.
+    Ordering and row boundaries are computed with NumPy (lexsort + searchsorted jumps),
+    so Python only touches each word once to build its Token.
+    """
+    # pdfplumber words always carry float top/x0/x1/bottom, so read them directly
+    toks: list[Token] = []
     for w in words:
-        t = _to_str(w.get("text"))
+        t = (w.get("text") or "").strip()
         if not t:
             continue
-        top = _to_float(w.get("top"))
-        x0 = _to_float(w.get("x0"))
-        x1 = _to_float(w.get("x1"), x0)
-        bottom = _to_float(w.get("bottom"), top + 8.0)
-        tok = Token(t, x0, x1, top, bottom)
-        if cur is None or abs(top - cur.y) > y_tol:
-            if cur is not None:
-                cur.toks.sort(key=lambda tt: tt.x0)
-                rows.append(cur)
-            cur = Row(y=top, toks=[tok])
-        else:
-            cur.toks.append(tok)
-    if cur is not None:
-        cur.toks.sort(key=lambda tt: tt.x0)
-        rows.append(cur)
+        toks.append(Token(t, w["x0"], w["x1"], w["top"], w["bottom"]))
+    if not toks:
+        return []
+
+    n = len(toks)
+    tops = np.fromiter((tok.y0 for tok in toks), dtype=np.float64, count=n)
+    xs0 = np.fromiter((tok.x0 for tok in toks), dtype=np.float64, count=n)
+    order = np.lexsort((xs0, tops))
+    tops_sorted = tops[order]
+
+    rows: list[Row] = []
+    start = 0
+    while start < n:
+        row_y = tops_sorted[start]
+        end = int(np.searchsorted(tops_sorted, row_y + y_tol, side="right"))
+        group = order[start:end]
+        group = group[np.argsort(xs0[group], kind="stable")]
+        rows.append(Row(y=float(row_y), toks=[toks[k] for k in group]))
+        start = end
     return rows
 
 
@@ -96,9 +102,18 @@ def main() -> None:
     ap.add_argument("pdf", help="Path to PDF")
     ap.add_argument("--pages", help="Pages to include, e.g. 1-2,4", default=None)
     ap.add_argument("--grep", help="Regex to filter rows", default=None)
+    ap.add_argument(
+        "--verbose-pdf", action="store_true", help="Let pdfminer/pdfplumber log below ERROR"
+    )
     args = ap.parse_args()
+    if args.verbose_pdf:
+        for name in ("pdfminer", "pdfplumber"):
+            logging.getLogger(name).setLevel(logging.NOTSET)
 
-    if pdfplumber is None:
+    # Imported only once arguments parse, so --help and bad paths skip loading pdfminer
+    try:
+        import pdfplumber  # type: ignore
+    except Exception:
         print("pdfplumber unavailable in this environment.")
         return
 
@@ -111,20 +126,27 @@ def main() -> None:
     rx: Pattern[str] | None = re.compile(args.grep, re.I) if args.grep else None
 
     with pdfplumber.open(path) as pdf:  # type: ignore[misc]
-        for pidx, page in enumerate(pdf.pages, start=1):  # type: ignore[attr-defined]
-            if page_set and pidx not in page_set:
-                continue
+        pages = pdf.pages  # type: ignore[attr-defined]
+        # Visit only the selected pages instead of testing membership for every page
+        selected = (
+            sorted(i for i in page_set if 1 <= i <= len(pages))
+            if page_set
+            else range(1, len(pages) + 1)
+        )
+        for pidx in selected:
+            page = pages[pidx - 1]
             words = page.extract_words() or []  # type: ignore[call-arg, assignment]
-            words.sort(key=lambda w: (_to_float(w.get("top")), _to_float(w.get("x0"))))  # type: ignore[index]
             rows = group_words_into_rows(words, y_tol=3.0)
+            # Buffer the page and write it once rather than one print() per token
+            buf: list[str] = []
             for r in rows:
                 joined = " ".join(tok.text for tok in r.toks)
                 if rx and not rx.search(joined):
                     continue
-                print(f"[page {pidx} y={r.y:.1f}] {joined}")
-                for tok in r.toks:
-                    print(f"   - {tok.text!r} @ x0={tok.x0:.1f}..{tok.x1:.1f} y={tok.y0:.1f}")
-                print("-" * 60)
+                buf.append(f"[page {pidx} y={r.y:.1f}] {joined}\n")
+                buf.extend(_fmt_tok(tok.text, tok.x0, tok.x1, tok.y0) for tok in r.toks)
+                buf.append(_SEPARATOR)
+            sys.stdout.write("".join(buf))
 
 
 if __name__ == "__main__":